@@ -2,70 +2,102 @@
 # Console-based demo for physiotherapy exercises with logging
 # Now includes phase-aware feedback and safety escalation
 
+import asyncio
+import logging
 import time
-import random
+from collections import deque, namedtuple
+from dataclasses import dataclass
+
+import numpy as np
 from physio_exercises import EXERCISES, get_shoulder_abduction_angle, get_elbow_flexion_angle, get_shoulder_rotation_angle
 from exercise_router import validate_movement
 from realtime_feedback import generate_feedback, PhaseDetector
 from session_scoring import SessionScorer
+from telemetry import Angles, start_queue_logging
 
-def simulate_landmarks(base_angles):
-    """
-    Simulate landmarks with some variation.
+# Per-frame log lines; written to stdout by a background listener thread
+logger = logging.getLogger("physio.demo")
 
-    :param base_angles: Dict of base angles
-    :return: Mock landmarks dict
-    """
-    # Mock landmarks as dict for simplicity, in real use it's MediaPipe objects
-    # But for demo, we'll calculate angles directly
-    return {
-        "shoulder_abduction": base_angles.get("shoulder_abduction", 90) + random.uniform(-10, 10),
-        "elbow_flexion": base_angles.get("elbow_flexion", 10) + random.uniform(-5, 5),
-        "shoulder_internal": base_angles.get("shoulder_internal", 20) + random.uniform(-5, 5),
-        "shoulder_external": base_angles.get("shoulder_external", 30) + random.uniform(-5, 5)
-    }
+# Emit one frame log line in every LOG_EVERY frames (1 = every frame)
+LOG_EVERY = 1
+
+# Simulated frame period in seconds (20 FPS)
+FRAME_PERIOD = 0.05
+
+# Feedback results buffered between the worker and the logger. The frame
+# queue holds a single frame: when the worker falls behind, the newest frame
+# replaces the held one so latency stays bounded.
+PIPELINE_QUEUE_SIZE = 4
+
+# Generate feedback every Nth frame and hold the result in between
+# (phase detection still runs every frame). Set to 1 to evaluate every frame.
+FEEDBACK_EVERY = 3
 
+# Fixed mock pose for feedback generation, indexed like MediaPipe landmarks.
+# In real use, we'd have actual MediaPipe landmarks.
+LM = namedtuple("LM", "x y")
+MOCK_LANDMARKS = {
+    11: LM(0.5, 0.3),  # left_shoulder
+    12: LM(0.6, 0.3),  # right_shoulder
+    13: LM(0.7, 0.4),  # left_elbow
+    14: LM(0.7, 0.5),  # right_elbow
+    16: LM(0.8, 0.6),  # right_wrist
+    23: LM(0.5, 0.7),  # left_hip
+    24: LM(0.6, 0.7),  # right_hip
+}
 
-def run_demo(exercise_name, num_frames=50):
+
+@dataclass
+class FrameMetrics:
+    """Per-frame pipeline timings (milliseconds) and feedback queue depth."""
+    frame_latency_ms: float
+    feedback_latency_ms: float
+    phase_detect_latency_ms: float
+    queue_depth: int
+
+
+def _print_metrics_summary(metrics):
     """
-    Run a demo session for the exercise with phase-aware feedback.
-    
-    :param exercise_name: Name of the exercise
-    :param num_frames: Number of frames to simulate
+    Print p50/p95/p99 of each recorded frame metric.
+
+    :param metrics: Iterable of FrameMetrics
     """
-    exercise = EXERCISES.get(exercise_name.lower())
-    if not exercise:
-        print("Invalid exercise")
+    rows = np.array([(m.frame_latency_ms, m.feedback_latency_ms, m.phase_detect_latency_ms, m.queue_depth)
+                     for m in metrics], dtype=np.float64)
+    if not len(rows):
         return
+    p50, p95, p99 = np.percentile(rows, [50, 95, 99], axis=0)
+    print(f"\nFrame Metrics (p50 / p95 / p99):")
+    for i, label in enumerate(("Frame Latency (ms)", "Feedback Latency (ms)", "Phase Detect Latency (ms)", "Queue Depth")):
+        print(f"  - {label}: {p50[i]:.3f} / {p95[i]:.3f} / {p99[i]:.3f}")
 
-    scorer = SessionScorer(exercise_name)
-    phase_detector = PhaseDetector(exercise_name)
-    
-    print(f"\n{'='*60}")
-    print(f"PHYSIO INTELLIGENCE DEMO - {exercise.name.upper()}")
-    print(f"{'='*60}")
-    print(f"Description: {exercise.description}")
-    print(f"Frames to simulate: {num_frames}")
-    print(f"Features: Phase-aware feedback, Safety escalation, Live observability")
-    print(f"{'='*60}\n")
 
+def _simulate_phase_targets(exercise_name, angle_names, num_frames, rng=None):
+    """
+    Unroll the simulated phase progression into per-frame target angles.
+
+    :param exercise_name: Name of the exercise (normalized)
+    :param angle_names: Angle names, giving the column order
+    :param num_frames: Number of frames to simulate
+    :param rng: Optional numpy Generator (for reproducible runs)
+    :return: float32 array of shape (num_frames, len(angle_names)) with variation added
+    """
     # Simulate movement phases
     phase_sequence = ["RAISE", "HOLD", "LOWER", "NEUTRAL"]
     current_phase_index = 0
     frames_in_phase = 0
     phase_target_frames = {"RAISE": 10, "HOLD": 15, "LOWER": 10, "NEUTRAL": 15}
-    
+
+    targets = np.empty((num_frames, len(angle_names)), dtype=np.float32)
     for frame in range(num_frames):
-        timestamp = time.time()
-        
         # Simulate phase progression
         phase = phase_sequence[current_phase_index]
         frames_in_phase += 1
-        
+
         if frames_in_phase >= phase_target_frames.get(phase, 10):
             current_phase_index = (current_phase_index + 1) % len(phase_sequence)
             frames_in_phase = 0
-        
+
         # Generate target angles based on phase
         if exercise_name == "arm_raise":
             if phase == "RAISE":
@@ -78,13 +110,13 @@ def run_demo(exercise_name, num_frames=50):
                 base = {"shoulder_abduction": 15, "elbow_flexion": 10}
         elif exercise_name == "shoulder_rotation":
             if phase == "RAISE":
-                base = {"shoulder_internal": frames_in_phase * 6, "shoulder_external": 10}
+                base = {"shoulder_internal_rotation": frames_in_phase * 6, "shoulder_external_rotation": 10}
             elif phase == "HOLD":
-                base = {"shoulder_internal": 60, "shoulder_external": 10}
+                base = {"shoulder_internal_rotation": 60, "shoulder_external_rotation": 10}
             elif phase == "LOWER":
-                base = {"shoulder_internal": 60 - frames_in_phase * 5, "shoulder_external": 10}
+                base = {"shoulder_internal_rotation": 60 - frames_in_phase * 5, "shoulder_external_rotation": 10}
             else:
-                base = {"shoulder_internal": 10, "shoulder_external": 10}
+                base = {"shoulder_internal_rotation": 10, "shoulder_external_rotation": 10}
         else:  # elbow_flexion
             if phase == "RAISE":
                 base = {"elbow_flexion": 30 + frames_in_phase * 10}
@@ -95,58 +127,159 @@ def run_demo(exercise_name, num_frames=50):
             else:
                 base = {"elbow_flexion": 20}
 
-        # Add some variation
-        simulated_angles = {}
-        for angle_name, value in base.items():
-            variation = random.uniform(-5, 5)
-            simulated_angles[angle_name] = value + variation
-
-        # Mock validations
-        validations = {}
-        for angle_name, value in simulated_angles.items():
-            if angle_name in exercise.angle_ranges:
-                min_a, max_a = exercise.angle_ranges[angle_name]
-                validations[angle_name] = min_a <= value <= max_a
-        
-        # Get phase info
+        targets[frame] = [base[name] for name in angle_names]
+
+    # Add some variation, for every frame in a single call
+    rng = rng or np.random.default_rng()
+    targets += rng.uniform(-5, 5, size=targets.shape).astype(np.float32)
+    return targets
+
+
+def run_demo(exercise_name, num_frames=50, feedback_every=FEEDBACK_EVERY):
+    """
+    Run a demo session for the exercise with phase-aware feedback.
+    
+    :param exercise_name: Name of the exercise
+    :param num_frames: Number of frames to simulate
+    :param feedback_every: Recompute feedback every N frames (1 = every frame)
+    :return: Pipeline stats dict (dropped_frames, queue_depth_peak, log_queue_peak), or None for an invalid exercise
+    """
+    return asyncio.run(run_demo_async(exercise_name, num_frames, feedback_every))
+
+
+async def run_demo_async(exercise_name, num_frames=50, feedback_every=FEEDBACK_EVERY):
+    """
+    Run a demo session as an asyncio pipeline of frame producer, feedback worker and logger.
+
+    :param exercise_name: Name of the exercise
+    :param num_frames: Number of frames to simulate
+    :param feedback_every: Recompute feedback every N frames (1 = every frame)
+    :return: Pipeline stats dict (dropped_frames, queue_depth_peak, log_queue_peak), or None for an invalid exercise
+    """
+    # Resolve the exercise once; everything per-frame uses the normalized name
+    exercise_name = exercise_name.lower()
+    exercise = EXERCISES.get(exercise_name)
+    if not exercise:
+        print("Invalid exercise")
+        return
+
+    scorer = SessionScorer(exercise_name)
+    scorer.specialize(exercise.angle_ranges)
+    phase_detector = PhaseDetector(exercise_name)
+    
+    print(f"\n{'='*60}")
+    print(f"PHYSIO INTELLIGENCE DEMO - {exercise.name.upper()}")
+    print(f"{'='*60}")
+    print(f"Description: {exercise.description}")
+    print(f"Frames to simulate: {num_frames}")
+    print(f"Features: Phase-aware feedback, Safety escalation, Live observability")
+    print(f"{'='*60}\n")
+
+    # Safe ranges as arrays so each frame is validated in one vectorized compare
+    angle_names = list(exercise.angle_ranges.keys())
+    mins = np.fromiter((r[0] for r in exercise.angle_ranges.values()), dtype=np.float32)
+    maxs = np.fromiter((r[1] for r in exercise.angle_ranges.values()), dtype=np.float32)
+
+    # Target angles (with variation) for every frame, unrolled up front
+    targets = _simulate_phase_targets(exercise_name, angle_names, num_frames)
+
+    # Three-stage pipeline: frame producer -> feedback worker -> logger.
+    # The worker's CPU stage runs in a thread, so feedback on frame N overlaps
+    # producing frame N+1; a frame the worker hasn't taken yet is dropped.
+    frame_q = asyncio.Queue(maxsize=1)
+    fb_q = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    pipeline_stats = {"dropped_frames": 0, "queue_depth_peak": 0, "log_queue_peak": 0}
+    metrics = deque(maxlen=max(num_frames, 1))
+
+    async def produce_frames():
+        # Pace frames against a monotonic deadline so frame work doesn't add drift
+        deadline = time.monotonic()
+        for frame in range(num_frames):
+            timestamp = time.monotonic()
+
+            values = targets[frame]
+            simulated_angles = dict(zip(angle_names, values.tolist()))
+
+            # Mock validations
+            mask = (values >= mins) & (values <= maxs)
+            validations = dict(zip(angle_names, mask.tolist()))
+            is_safe = bool(mask.all())
+
+            # Latest frame wins: replace a frame the worker hasn't picked up yet
+            if frame_q.full():
+                frame_q.get_nowait()
+                pipeline_stats["dropped_frames"] += 1
+            frame_q.put_nowait((frame, timestamp, simulated_angles, validations, is_safe))
+
+            # Simulate frame rate (always yield so the worker gets a turn)
+            deadline += FRAME_PERIOD
+            remaining = deadline - time.monotonic()
+            await asyncio.sleep(max(0, remaining))
+        await frame_q.put(None)
+
+    def analyse_frame(frame, simulated_angles, validations, feedbacks):
+        # Get phase info (every frame: hold_frames counts frames)
+        t_start = time.perf_counter_ns()
         primary_angle = simulated_angles.get("shoulder_abduction") or simulated_angles.get("elbow_flexion") or 0
-        phase_info = phase_detector.detect_phase(primary_angle, frame)
-        
-        # Generate phase-aware feedback (simulated landmarks for demo)
-        # In real use, we'd have actual MediaPipe landmarks
-        mock_landmarks = type('obj', (object,), {
-            '11': type('obj', (object,), {'x': 0.5, 'y': 0.3})(),  # left_shoulder
-            '12': type('obj', (object,), {'x': 0.6, 'y': 0.3})(),  # right_shoulder
-            '13': type('obj', (object,), {'x': 0.7, 'y': 0.4})(),  # left_elbow
-            '14': type('obj', (object,), {'x': 0.7, 'y': 0.5})(),  # right_elbow
-            '16': type('obj', (object,), {'x': 0.8, 'y': 0.6})(),  # right_wrist
-            '23': type('obj', (object,), {'x': 0.5, 'y': 0.7})(),  # left_hip
-            '24': type('obj', (object,), {'x': 0.6, 'y': 0.7})(),  # right_hip
-        })()
-        
-        feedbacks = generate_feedback(exercise_name, mock_landmarks, phase_info)
-        
-        # Add phase-specific feedback
-        phase_feedback = f"[{phase_info['phase']}] Phase: {phase}, Hold: {phase_info['hold_frames']} frames"
-        
-        # Log entry
-        log_entry = {
-            "frame": frame + 1,
-            "timestamp": timestamp,
-            "phase": phase_info["phase"],
-            "angles": simulated_angles,
-            "feedbacks": feedbacks,
-            "safe": all(validations.values())
-        }
-        
-        # Print log
-        safety_indicator = "✓" if all(validations.values()) else "⚠"
-        print(f"[{frame+1:3d}] {safety_indicator} Phase: {phase_info['phase']:6s} | Angles: {simulated_angles} | Feedback: {feedbacks[0] if feedbacks else 'None'}")
-        
+        phase = phase_detector.detect_phase(primary_angle, frame)
+        t_phase = t_feedback = time.perf_counter_ns()
+
+        # Between refreshes, hold the last feedback
+        if feedbacks is None or frame % feedback_every == 0:
+            # Generate phase-aware feedback (simulated landmarks for demo)
+            feedbacks = generate_feedback(exercise_name, MOCK_LANDMARKS, phase_detector, exercise=exercise)
+            t_feedback = time.perf_counter_ns()
+
         # Add to scorer
         scorer.add_frame(simulated_angles, validations, exercise.angle_ranges)
-        
-        time.sleep(0.05)  # Simulate frame rate
+        return phase, feedbacks, t_start, t_phase, t_feedback
+
+    async def process_feedback():
+        feedbacks = None
+        while True:
+            item = await frame_q.get()
+            if item is None:
+                break
+            frame, timestamp, simulated_angles, validations, is_safe = item
+
+            # Off the event loop, so the producer keeps its frame rate meanwhile
+            phase, feedbacks, t_start, t_phase, t_feedback = await asyncio.to_thread(
+                analyse_frame, frame, simulated_angles, validations, feedbacks
+            )
+
+            await fb_q.put((frame, timestamp, phase, simulated_angles, is_safe, feedbacks))
+            queue_depth = fb_q.qsize()
+            pipeline_stats["queue_depth_peak"] = max(pipeline_stats["queue_depth_peak"], queue_depth)
+            metrics.append(FrameMetrics(
+                frame_latency_ms=(time.monotonic() - timestamp) * 1000,
+                feedback_latency_ms=(t_feedback - t_phase) / 1e6,
+                phase_detect_latency_ms=(t_phase - t_start) / 1e6,
+                queue_depth=queue_depth
+            ))
+        await fb_q.put(None)
+
+    async def log_frames():
+        while True:
+            item = await fb_q.get()
+            if item is None:
+                break
+            frame, timestamp, phase, simulated_angles, is_safe, feedbacks = item
+
+            # Log (only enqueued here; the listener thread does the write)
+            safety_indicator = "✓" if is_safe else "⚠"
+            logger.info(
+                "[%3d] %s Phase: %-6s | Angles: %s | Feedback: %s",
+                frame + 1, safety_indicator, phase, Angles(simulated_angles), feedbacks[0] if feedbacks else "None",
+                extra={"frame": frame + 1}
+            )
+            pipeline_stats["log_queue_peak"] = max(pipeline_stats["log_queue_peak"], log_q.qsize())
+
+    listener, log_q = start_queue_logging(logger, sample_every=LOG_EVERY)
+    try:
+        await asyncio.gather(produce_frames(), process_feedback(), log_frames())
+    finally:
+        # Flush pending lines before the summary is printed
+        listener.stop()
 
     # Final score
     print(f"\n{'='*60}")
@@ -163,8 +296,15 @@ def run_demo(exercise_name, num_frames=50):
     print(f"  - By Severity: {safety['by_severity']}")
     print(f"  - Escalation Events: {safety['escalation_events']}")
     print(f"  - Highest Warning Level: {safety['highest_warning_level']}")
+    print(f"\nPipeline:")
+    print(f"  - Dropped Frames: {pipeline_stats['dropped_frames']}")
+    print(f"  - Queue Depth Peak: {pipeline_stats['queue_depth_peak']}")
+    print(f"  - Log Queue Peak: {pipeline_stats['log_queue_peak']}")
+    _print_metrics_summary(metrics)
     print(f"{'='*60}")
 
+    return pipeline_stats
+
 
 if __name__ == "__main__":
     print("Physio Intelligence Demo - Console Version")
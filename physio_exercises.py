@@ -85,6 +85,14 @@ def get_shoulder_rotation_angle(landmarks):
     wrist = (landmarks[16].x, landmarks[16].y)
     hip = (landmarks[24].x, landmarks[24].y)
 
+    return _rotation_angles(shoulder, elbow, wrist, hip)
+
+def _rotation_angles(shoulder, elbow, wrist, hip):
+    """
+    Shoulder rotation from right-arm points (x, y); see get_shoulder_rotation_angle.
+
+    :return: Dict with 'internal' and 'external' angles (simplified)
+    """
     # Vector from hip to shoulder (torso direction)
     torso_x = shoulder[0] - hip[0]
     torso_y = shoulder[1] - hip[1]
@@ -112,6 +120,34 @@ def get_shoulder_rotation_angle(landmarks):
     else:
         return {"internal": angle, "external": 0}
 
+# Keys of the dict returned by get_joint_angles
+JOINT_ANGLE_NAMES = (
+    "shoulder_abduction", "elbow_flexion", "shoulder_internal_rotation", "shoulder_external_rotation"
+)
+
+def get_joint_angles(landmarks):
+    """
+    Calculate all exercise angles, reading each right-arm landmark once.
+    Same values as get_shoulder_abduction_angle, get_elbow_flexion_angle and
+    get_shoulder_rotation_angle.
+
+    :param landmarks: MediaPipe pose landmarks
+    :return: Dict of angle name (JOINT_ANGLE_NAMES) to angle in degrees
+    """
+    shoulder_lm, elbow_lm, wrist_lm, hip_lm = landmarks[12], landmarks[14], landmarks[16], landmarks[24]
+    shoulder = (shoulder_lm.x, shoulder_lm.y)
+    elbow = (elbow_lm.x, elbow_lm.y)
+    wrist = (wrist_lm.x, wrist_lm.y)
+    hip = (hip_lm.x, hip_lm.y)
+
+    rotation = _rotation_angles(shoulder, elbow, wrist, hip)
+    return {
+        "shoulder_abduction": calculate_angle(hip, shoulder, elbow),
+        "elbow_flexion": calculate_angle(shoulder, elbow, wrist),
+        "shoulder_internal_rotation": rotation["internal"],
+        "shoulder_external_rotation": rotation["external"]
+    }
+
 class PhysioExercise:
     def __init__(self, name, description, angle_ranges):
         """
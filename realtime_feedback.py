@@ -2,12 +2,10 @@
 # Generates real-time corrective text feedback per frame based on movement validation
 # Now includes phase-aware feedback (raise/hold/lower) for temporal intelligence
 
-from physio_exercises import (
-    EXERCISES,
-    get_shoulder_abduction_angle,
-    get_elbow_flexion_angle,
-    get_shoulder_rotation_angle
-)
+import functools
+
+import physio_exercises as _px
+from physio_exercises import EXERCISES
 
 # Phase thresholds for different exercises
 PHASE_THRESHOLDS = {
@@ -25,19 +23,90 @@ PHASE_THRESHOLDS = {
     }
 }
 
+# Corrective directions when an angle is below / above its safe range
+_LOW_MSG = {
+    "shoulder_abduction": "Raise arm higher",
+    "elbow_flexion": "Bend elbow more",
+    "shoulder_internal_rotation": "Rotate shoulder internally more",
+    "shoulder_external_rotation": "Rotate shoulder externally more",
+}
+
+_HIGH_MSG = {
+    "shoulder_abduction": "Lower arm",
+    "elbow_flexion": "Straighten elbow",
+    "shoulder_internal_rotation": "Reduce internal rotation",
+    "shoulder_external_rotation": "Reduce external rotation",
+}
+
+# Deviation (degrees) bucket limits and the matching severity words
+_SLIGHT_MAX_DEVIATION = 15
+_MODERATE_MAX_DEVIATION = 30
+_SEVERITY_WORDS = ("slightly", "", "significantly")
+
+# Phase ids index PHASE_NAMES; detectors keep the id and render the name on access
+PHASE_NAMES = ("NEUTRAL", "RAISE", "HOLD", "LOWER")
+_NEUTRAL, _RAISE, _HOLD, _LOWER = range(len(PHASE_NAMES))
+
+
+def _phase_transition(prev_phase, above_raise, below_lower):
+    """
+    Phase transition for one case; used to build the transition table.
+
+    :param prev_phase: Previous phase id
+    :param above_raise: Angle is at or above the raise_complete threshold
+    :param below_lower: Angle is at or below the lower_complete threshold
+    :return: Tuple of (new phase id, hold multiplier, hold increment, restart phase)
+    """
+    if above_raise:
+        if prev_phase in (_RAISE, _HOLD):
+            return _HOLD, 1, 1, False
+        return _RAISE, 0, 0, True
+    if below_lower:
+        return _LOWER, 0, 0, True
+    if prev_phase == _LOWER:
+        return _RAISE, 1, 0, True
+    if prev_phase in (_RAISE, _HOLD):
+        return _HOLD, 1, 1, False
+    return prev_phase, 1, 0, False
+
+
+# _TRANSITIONS[prev_phase][above_raise][below_lower]; hold_frames becomes
+# hold_frames * multiplier + increment
+_TRANSITIONS = tuple(
+    tuple(
+        tuple(_phase_transition(prev_phase, above, below) for below in (False, True))
+        for above in (False, True)
+    )
+    for prev_phase in range(len(PHASE_NAMES))
+)
+
+
 class PhaseDetector:
     """
     Detects the current phase of an exercise movement.
     Phases: RAISE, HOLD, LOWER, NEUTRAL
+    Current state is read from the phase and hold_frames attributes.
     """
+
+    __slots__ = (
+        "exercise_name", "thresholds", "raise_complete", "lower_complete",
+        "phase_id", "phase_start_frame", "hold_frames", "last_angle"
+    )
     
     def __init__(self, exercise_name):
         self.exercise_name = exercise_name
         self.thresholds = PHASE_THRESHOLDS.get(exercise_name, {})
-        self.current_phase = "NEUTRAL"
+        self.raise_complete = self.thresholds.get("raise_complete", 120)
+        self.lower_complete = self.thresholds.get("lower_complete", 30)
+        self.phase_id = _NEUTRAL
         self.phase_start_frame = 0
         self.hold_frames = 0
         self.last_angle = 0
+
+    @property
+    def phase(self):
+        """Current phase name."""
+        return PHASE_NAMES[self.phase_id]
         
     def detect_phase(self, angle_value, frame_count):
         """
@@ -49,89 +118,60 @@ class PhaseDetector:
         """
         if not self.thresholds:
             return "NEUTRAL"
-        
-        raise_complete = self.thresholds.get("raise_complete", 120)
-        lower_complete = self.thresholds.get("lower_complete", 30)
-        
-        prev_phase = self.current_phase
-        
+
         # Phase detection logic
-        if angle_value >= raise_complete:
-            if prev_phase not in ["RAISE", "HOLD"]:
-                self.current_phase = "RAISE"
-                self.phase_start_frame = frame_count
-                self.hold_frames = 0
-            else:
-                self.current_phase = "HOLD"
-                self.hold_frames += 1
-        elif angle_value <= lower_complete:
-            self.current_phase = "LOWER"
+        # bool() so NumPy scalar angles (whose comparisons give numpy.bool) index the table too
+        phase_id, hold_mult, hold_inc, restart = _TRANSITIONS[self.phase_id][
+            bool(angle_value >= self.raise_complete)][bool(angle_value <= self.lower_complete)]
+        self.phase_id = phase_id
+        self.hold_frames = self.hold_frames * hold_mult + hold_inc
+        if restart:
             self.phase_start_frame = frame_count
-            self.hold_frames = 0
-        elif angle_value > lower_complete and angle_value < raise_complete:
-            if prev_phase == "LOWER":
-                self.current_phase = "RAISE"
-                self.phase_start_frame = frame_count
-            elif prev_phase in ["RAISE", "HOLD"]:
-                self.current_phase = "HOLD"
-                self.hold_frames += 1
         
-        return self.current_phase
-    
-    def get_phase_info(self):
-        """Get current phase information."""
-        return {
-            "phase": self.current_phase,
-            "hold_frames": self.hold_frames,
-            "phase_duration": self.hold_frames  # Frames in current phase
-        }
+        return PHASE_NAMES[phase_id]
 
 
-def get_angle_feedback(angle_name, angle_value, min_angle, max_angle):
+def _classify(angle_value, min_angle, max_angle):
     """
-    Generate feedback for a specific angle based on deviation from safe range.
+    Classify an angle against its safe range using numbers only.
 
-    :param angle_name: Name of the angle
     :param angle_value: Current angle value
     :param min_angle: Minimum safe angle
     :param max_angle: Maximum safe angle
-    :return: Feedback string or None if safe
+    :return: Tuple of (severity code into _SEVERITY_WORDS, direction sign, deviation);
+             direction is -1 below the range, 1 above it and 0 when safe
     """
-    if min_angle <= angle_value <= max_angle:
-        return None
-
-    deviation = 0
-    direction = ""
     if angle_value < min_angle:
         deviation = min_angle - angle_value
-        if "shoulder_abduction" in angle_name:
-            direction = "Raise arm higher"
-        elif "elbow_flexion" in angle_name:
-            direction = "Bend elbow more"
-        elif "shoulder_internal_rotation" in angle_name:
-            direction = "Rotate shoulder internally more"
-        elif "shoulder_external_rotation" in angle_name:
-            direction = "Rotate shoulder externally more"
-    else:
+        direction = -1
+    elif angle_value > max_angle:
         deviation = angle_value - max_angle
-        if "shoulder_abduction" in angle_name:
-            direction = "Lower arm"
-        elif "elbow_flexion" in angle_name:
-            direction = "Straighten elbow"
-        elif "shoulder_internal_rotation" in angle_name:
-            direction = "Reduce internal rotation"
-        elif "shoulder_external_rotation" in angle_name:
-            direction = "Reduce external rotation"
+        direction = 1
+    else:
+        return 0, 0, 0
 
     # Severity based on deviation
-    if deviation > 30:
-        severity = "significantly"
-    elif deviation > 15:
-        severity = ""
-    else:
-        severity = "slightly"
+    if deviation <= _SLIGHT_MAX_DEVIATION:
+        return 0, direction, deviation
+    return (1 if deviation <= _MODERATE_MAX_DEVIATION else 2), direction, deviation
+
+
+def get_angle_feedback(angle_name, angle_value, min_angle, max_angle):
+    """
+    Generate feedback for a specific angle based on deviation from safe range.
+
+    :param angle_name: Name of the angle
+    :param angle_value: Current angle value
+    :param min_angle: Minimum safe angle
+    :param max_angle: Maximum safe angle
+    :return: Feedback string or None if safe
+    """
+    severity, direction, _ = _classify(angle_value, min_angle, max_angle)
+    if not direction:
+        return None
 
-    feedback = f"{severity} {direction}".strip()
+    messages = _LOW_MSG if direction < 0 else _HIGH_MSG
+    feedback = f"{_SEVERITY_WORDS[severity]} {messages.get(angle_name, '')}".strip()
     return feedback
 
 
@@ -140,12 +180,12 @@ def get_phase_feedback(exercise_name, phase_info, angle_value):
     Generate phase-specific feedback.
     
     :param exercise_name: Name of the exercise
-    :param phase_info: Dict with phase information
+    :param phase_info: PhaseDetector (anything with phase / hold_frames attributes)
     :param angle_value: Current angle value
     :return: Feedback string or None
     """
-    phase = phase_info.get("phase", "NEUTRAL")
-    hold_frames = phase_info.get("hold_frames", 0)
+    phase = phase_info.phase
+    hold_frames = phase_info.hold_frames
     
     if exercise_name == "arm_raise":
         if phase == "RAISE" and hold_frames < 5:
@@ -180,64 +220,153 @@ def get_phase_feedback(exercise_name, phase_info, angle_value):
     return None
 
 
-def generate_feedback(exercise_name, landmarks, phase_info=None):
-    """
-    Generate real-time feedback for the selected exercise based on current landmarks.
-    Now includes phase-aware feedback.
+# Angle name -> (physio_exercises getter name, key into the getter's result or
+# None for a scalar). Order here is the order feedback is reported in.
+_ANGLE_SOURCES = {
+    "shoulder_abduction": ("get_shoulder_abduction_angle", None),
+    "elbow_flexion": ("get_elbow_flexion_angle", None),
+    "shoulder_internal_rotation": ("get_shoulder_rotation_angle", "internal"),
+    "shoulder_external_rotation": ("get_shoulder_rotation_angle", "external"),
+}
 
-    :param exercise_name: Name of the exercise
-    :param landmarks: MediaPipe pose landmarks
-    :param phase_info: Optional phase information for phase-aware feedback
-    :return: List of feedback strings
+
+@functools.lru_cache(maxsize=None)
+def _get_angle_fn(name):
+    """Resolve an angle getter from physio_exercises, only when a plan needs it."""
+    return getattr(_px, name)
+
+
+def _build_feedback_plan(exercise):
     """
-    exercise = EXERCISES.get(exercise_name.lower())
-    if not exercise:
-        return ["Invalid exercise"]
+    Precompute the per-frame feedback work for an exercise.
+
+    Checks are grouped by getter so each angle function runs once per frame
+    (the rotation getter feeds both internal and external checks).
 
-    feedbacks = []
+    :param exercise: PhysioExercise object
+    :return: Tuple of (primary angle name or None, list of (getter, [(angle_name, key, min, max), ...]))
+    """
     angle_ranges = exercise.angle_ranges
+    groups = {}
+    for angle_name, (getter_name, key) in _ANGLE_SOURCES.items():
+        if angle_name in angle_ranges:
+            min_angle, max_angle = angle_ranges[angle_name]
+            groups.setdefault(_get_angle_fn(getter_name), []).append((angle_name, key, min_angle, max_angle))
 
-    # Get primary angle for phase detection
-    primary_angle = None
+    # Primary angle drives phase-aware feedback
+    primary_name = None
     if "shoulder_abduction" in angle_ranges:
-        primary_angle = get_shoulder_abduction_angle(landmarks)
+        primary_name = "shoulder_abduction"
     elif "elbow_flexion" in angle_ranges:
-        primary_angle = get_elbow_flexion_angle(landmarks)
+        primary_name = "elbow_flexion"
+
+    return primary_name, list(groups.items())
+
+
+def _feedback_choice(messages, angle_name, deviation_expr):
+    """Source for an expression picking the literal feedback string for a deviation."""
+    direction = messages.get(angle_name, "")
+    slight, moderate, significant = (f"{word} {direction}".strip() for word in _SEVERITY_WORDS)
+    return (
+        f"({slight!r} if {deviation_expr} <= {_SLIGHT_MAX_DEVIATION} "
+        f"else {moderate!r} if {deviation_expr} <= {_MODERATE_MAX_DEVIATION} "
+        f"else {significant!r})"
+    )
 
-    # Generate angle-based feedback
-    if "shoulder_abduction" in angle_ranges:
-        angle = get_shoulder_abduction_angle(landmarks)
-        feedback = get_angle_feedback("shoulder_abduction", angle, *angle_ranges["shoulder_abduction"])
-        if feedback:
-            feedbacks.append(feedback)
-
-    if "elbow_flexion" in angle_ranges:
-        angle = get_elbow_flexion_angle(landmarks)
-        feedback = get_angle_feedback("elbow_flexion", angle, *angle_ranges["elbow_flexion"])
-        if feedback:
-            feedbacks.append(feedback)
-
-    if "shoulder_internal_rotation" in angle_ranges or "shoulder_external_rotation" in angle_ranges:
-        rotation_angles = get_shoulder_rotation_angle(landmarks)
-        if "shoulder_internal_rotation" in angle_ranges:
-            feedback = get_angle_feedback("shoulder_internal_rotation", rotation_angles["internal"], *angle_ranges["shoulder_internal_rotation"])
-            if feedback:
-                feedbacks.append(feedback)
-        if "shoulder_external_rotation" in angle_ranges:
-            feedback = get_angle_feedback("shoulder_external_rotation", rotation_angles["external"], *angle_ranges["shoulder_external_rotation"])
-            if feedback:
-                feedbacks.append(feedback)
+
+def _compile_feedback(exercise):
+    """
+    Generate a feedback function specialized to one exercise.
+
+    The exercise's plan is unrolled into straight-line source with the
+    feedback strings inlined as literals and the safe bounds bound as
+    constants of the generated function's namespace, then compiled.
+
+    :param exercise: PhysioExercise object
+    :return: Function (landmarks, phase_info, exercise_name, angles=None) -> list of feedback strings
+    """
+    primary_name, groups = _build_feedback_plan(exercise)
+    namespace = {"get_phase_feedback": get_phase_feedback}
+    lines = ["def feedback_fn(landmarks, phase_info, exercise_name, angles=None):", "    feedbacks = []"]
+    from_landmarks = ["    if angles is None:"]
+    from_angles = ["    else:"]
+    checks_src = []
+    primary_var = None
+
+    # Generate angle-based feedback; angle values come from the getters, or
+    # from precomputed angles when the caller already has them
+    for group_index, (getter, checks) in enumerate(groups):
+        namespace[getter.__name__] = getter
+        from_landmarks.append(f"        r{group_index} = {getter.__name__}(landmarks)")
+        for angle_name, key, min_angle, max_angle in checks:
+            var = f"r{group_index}" if key is None else f"r{group_index}_{key}"
+            if key is not None:
+                from_landmarks.append(f"        {var} = r{group_index}[{key!r}]")
+            from_angles.append(f"        {var} = angles[{angle_name!r}]")
+            if angle_name == primary_name:
+                primary_var = var
+            # Bounds are bound as globals rather than pasted in, since not every
+            # number's repr is valid source (inf, NumPy scalars)
+            namespace[f"lo_{var}"] = min_angle
+            namespace[f"hi_{var}"] = max_angle
+            checks_src += [
+                f"    if {var} < lo_{var}:",
+                f"        feedbacks.append({_feedback_choice(_LOW_MSG, angle_name, f'(lo_{var} - {var})')})",
+                f"    elif {var} > hi_{var}:",
+                f"        feedbacks.append({_feedback_choice(_HIGH_MSG, angle_name, f'({var} - hi_{var})')})",
+            ]
+    if groups:
+        lines += from_landmarks + from_angles + checks_src
 
     # Generate phase-aware feedback if phase info provided
-    if phase_info and primary_angle is not None:
-        phase_feedback = get_phase_feedback(exercise_name, phase_info, primary_angle)
-        if phase_feedback:
-            feedbacks.insert(0, f"[{phase_info.get('phase', 'NEUTRAL')}] {phase_feedback}")
+    if primary_var is not None:
+        lines += [
+            "    if phase_info is not None:",
+            f"        phase_feedback = get_phase_feedback(exercise_name, phase_info, {primary_var})",
+            "        if phase_feedback:",
+            "            feedbacks.insert(0, f'[{phase_info.phase}] {phase_feedback}')",
+        ]
+
+    lines.append("    return feedbacks or ['Good form']")
+    exec("\n".join(lines), namespace)
+    return namespace["feedback_fn"]
+
+
+# Feedback functions keyed by exercise, compiled on first use so a session
+# only pays for the exercise it runs
+_COMPILED = {}
+
 
-    if not feedbacks:
-        feedbacks.append("Good form")
+def _get_feedback_fn(exercise):
+    """Return the compiled feedback function for an exercise, compiling it on first use."""
+    feedback_fn = _COMPILED.get(exercise)
+    if feedback_fn is None:
+        feedback_fn = _COMPILED[exercise] = _compile_feedback(exercise)
+    return feedback_fn
+
+
+def generate_feedback(exercise_name, landmarks, phase_info=None, exercise=None, angles=None):
+    """
+    Generate real-time feedback for the selected exercise based on current landmarks.
+    Now includes phase-aware feedback.
+
+    :param exercise_name: Name of the exercise
+    :param landmarks: MediaPipe pose landmarks
+    :param phase_info: Optional PhaseDetector (anything with phase / hold_frames
+                       attributes) for phase-aware feedback
+    :param exercise: Optional PhysioExercise already resolved for exercise_name,
+                     so per-frame callers skip the name lookup
+    :param angles: Optional dict of already computed angles (e.g. from
+                   get_joint_angles) covering every angle the exercise checks,
+                   so they are not recomputed from the landmarks
+    :return: List of feedback strings
+    """
+    if exercise is None:
+        exercise = EXERCISES.get(exercise_name.lower())
+        if not exercise:
+            return ["Invalid exercise"]
 
-    return feedbacks
+    return _get_feedback_fn(exercise)(landmarks, phase_info, exercise_name, angles)
 
 
 if __name__ == "__main__":
@@ -2,14 +2,53 @@
 # Tracks per-exercise session scores based on consistency and completion quality
 # Now includes runtime safety violation escalation with clear alerts
 
-import statistics
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Frames of history kept for scoring (10 minutes at 30 FPS); older frames are
+# overwritten but still counted in the frame / safe-frame totals
+DEFAULT_FRAME_HISTORY = 18000
+
+# Angle history is stored as int16 tenths of a degree (90.3 -> 903)
+_ANGLE_SCALE = 10
+
+# Timestamps are taken with time.perf_counter_ns() and only turned into wall-clock
+# datetimes on demand, by offsetting from a (perf_counter_ns, datetime) pair
+_CLOCK_ANCHOR = (time.perf_counter_ns(), datetime.now())
+
+# Severity name -> row of the consecutive-violation counter array
+_SEV_ID = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# Severity name -> escalation / warning level
+_SEV_LEVEL = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+
+# Banner text indexed by warning level
+_WARNING_TEXTS = (
+    "SAFE",
+    "CAUTION: Minor deviation detected",
+    "WARNING: Moderate deviation - adjust position",
+    "HIGH WARNING: Significant deviation - slow down",
+    "CRITICAL: Stop exercise immediately"
+)
+
+def _to_datetime(perf_ns, clock_anchor=_CLOCK_ANCHOR):
+    """Convert a time.perf_counter_ns() reading to a wall-clock datetime."""
+    anchor_ns, anchor_dt = clock_anchor
+    return anchor_dt + timedelta(microseconds=(perf_ns - anchor_ns) / 1000)
 
 class SafetyViolation:
     """Represents a safety violation during a session."""
+
+    __slots__ = (
+        "timestamp_ns", "clock_anchor", "angle_name", "angle_value", "min_safe", "max_safe",
+        "severity", "frame_count", "escalated", "escalation_level"
+    )
     
-    def __init__(self, angle_name, angle_value, min_safe, max_safe, severity, frame_count):
-        self.timestamp = datetime.now()
+    def __init__(self, angle_name, angle_value, min_safe, max_safe, severity, frame_count, clock_anchor=_CLOCK_ANCHOR):
+        self.timestamp_ns = time.perf_counter_ns()
+        self.clock_anchor = clock_anchor
         self.angle_name = angle_name
         self.angle_value = angle_value
         self.min_safe = min_safe
@@ -19,6 +58,11 @@ class SafetyViolation:
         self.escalated = False
         self.escalation_level = 0
     
+    @property
+    def timestamp(self):
+        """Wall-clock time of the violation (computed on access)."""
+        return _to_datetime(self.timestamp_ns, self.clock_anchor)
+    
     def __str__(self):
         return f"[{self.severity.upper()}] {self.angle_name}: {self.angle_value:.1f}° (safe: {self.min_safe}-{self.max_safe}°)"
     
@@ -41,15 +85,30 @@ class SessionScorer:
     Tracks session scores and provides runtime safety escalation.
     """
     
-    def __init__(self, exercise_name, safety_escalation_thresholds=None):
+    def __init__(self, exercise_name, safety_escalation_thresholds=None, frame_history=DEFAULT_FRAME_HISTORY):
         """
         Initialize scorer for a specific exercise.
 
         :param exercise_name: Name of the exercise
         :param safety_escalation_thresholds: Dict defining when to escalate warnings
+        :param frame_history: Number of most recent frames kept for scoring
         """
         self.exercise_name = exercise_name
-        self.frames = []  # List of dicts with angle data and validation
+        self._clock_anchor = (time.perf_counter_ns(), datetime.now())
+        # Ring buffer of per-frame angles / validations / perf_counter_ns timestamps: one row
+        # per frame, one column per angle. Column order is fixed by the first frame;
+        # angles are int16 tenths of a degree (see _ANGLE_SCALE).
+        self._capacity = frame_history
+        self._angle_order = None
+        self._validation_order = None
+        self._angles = None
+        self._valid = None
+        self._ts = None
+        self.safe_frames = 0
+        # (angle_id, angle_name, min_safe, max_safe) per checked angle; see configure()
+        self._angle_ranges = None
+        self._ranges_tuple = ()
+        self._angle_id = {}
         self.safety_violations = []  # List of SafetyViolation objects
         self.violation_counts = {}  # Track violations per angle
         self.current_warning_level = 0  # 0=none, 1=caution, 2=warning, 3=critical
@@ -63,13 +122,12 @@ class SessionScorer:
             "critical": 1   # Immediate escalation
         }
         
-        # Initialize violation tracking
-        self.violation_tracking = {
-            "low": {},
-            "medium": {},
-            "high": {},
-            "critical": {}
-        }
+        self._thresholds = np.array(
+            [self.escalation_thresholds.get(sev, 5) for sev in _SEV_ID], dtype=np.int32
+        )
+        
+        # Consecutive violation counts: one row per severity (_SEV_ID), one column per angle
+        self._vcount = np.zeros((len(_SEV_ID), 0), dtype=np.int32)
     
     def add_frame(self, angles, validations, angle_ranges):
         """
@@ -79,18 +137,135 @@ class SessionScorer:
         :param validations: Dict of angle names to bool (safe or not)
         :param angle_ranges: Dict of angle names to (min, max) safe ranges
         """
+        if self._angles is None:
+            self._angle_order = tuple(angles)
+            self._validation_order = tuple(validations)
+            self._angles = np.empty((self._capacity, len(self._angle_order)), dtype=np.int16)
+            self._valid = np.empty((self._capacity, len(self._validation_order)), dtype=np.bool_)
+            self._ts = np.empty(self._capacity, dtype=np.int64)
+
+        idx = self.frame_count % self._capacity
+        self._angles[idx] = [round(angles[n] * _ANGLE_SCALE) for n in self._angle_order]
+        self._valid[idx] = [validations[n] for n in self._validation_order]
+        self._ts[idx] = time.perf_counter_ns()
+        if self._valid[idx].all():
+            self.safe_frames += 1
         self.frame_count += 1
-        frame_data = {
-            "frame": self.frame_count,
-            "angles": angles.copy(),
-            "validations": validations.copy(),
-            "timestamp": datetime.now()
-        }
-        self.frames.append(frame_data)
         
         # Check for safety violations
         self._check_safety_violations(angles, validations, angle_ranges)
     
+    @property
+    def frames(self):
+        """Retained per-frame records as dicts, oldest first (built lazily from the ring buffer)."""
+        first = max(0, self.frame_count - self._capacity)
+        for frame in range(first, self.frame_count):
+            idx = frame % self._capacity
+            yield {
+                "frame": frame + 1,
+                "angles": dict(zip(self._angle_order, (self._angles[idx] / _ANGLE_SCALE).tolist())),
+                "validations": dict(zip(self._validation_order, self._valid[idx].tolist())),
+                "timestamp": _to_datetime(int(self._ts[idx]), self._clock_anchor)
+            }
+
+    def configure(self, angle_ranges):
+        """
+        Precompute the safe ranges checked for violations on every frame.
+
+        :param angle_ranges: Dict of angle names to (min, max) safe ranges
+        """
+        old_ids, old_counts = self._angle_id, self._vcount
+        self._angle_ranges = angle_ranges
+        self._angle_id = {name: i for i, name in enumerate(angle_ranges)}
+        self._ranges_tuple = tuple((i, name, r[0], r[1]) for i, (name, r) in enumerate(angle_ranges.items()))
+        # Carry over counts for angles that were already being tracked
+        self._vcount = np.zeros((len(_SEV_ID), len(self._angle_id)), dtype=np.int32)
+        for name, i in self._angle_id.items():
+            if name in old_ids:
+                self._vcount[:, i] = old_counts[:, old_ids[name]]
+
+    def specialize(self, angle_ranges):
+        """
+        Replace add_frame on this scorer with a version compiled for a fixed angle set.
+
+        The generated method has the angle names and buffer columns inlined as
+        literals and the safe ranges and escalation thresholds bound as
+        constants of its namespace, so the per-frame path does no dict
+        iteration. Every frame must then carry exactly the angles (and
+        validations) named in angle_ranges; its angle_ranges argument is ignored.
+        Call before the first frame.
+
+        :param angle_ranges: Dict of angle names to (min, max) safe ranges
+        """
+        names = tuple(angle_ranges)
+        if self._angles is not None and (self._angle_order, self._validation_order) != (names, names):
+            raise ValueError("specialize() must be called before frames with a different angle set are added")
+
+        self.configure(angle_ranges)
+        if self._angles is None:
+            self._angle_order = self._validation_order = names
+            self._angles = np.empty((self._capacity, len(names)), dtype=np.int16)
+            self._valid = np.empty((self._capacity, len(names)), dtype=np.bool_)
+            self._ts = np.empty(self._capacity, dtype=np.int64)
+
+        namespace = {
+            "angle_buf": self._angles,
+            "valid_buf": self._valid,
+            "ts_buf": self._ts,
+            "vcount": self._vcount,
+            "perf_counter_ns": time.perf_counter_ns,
+        }
+        # Numbers are bound as globals rather than pasted in, since not every
+        # number's repr is valid source (inf, NumPy scalars)
+        for sid, threshold in enumerate(self._thresholds.tolist()):
+            namespace[f"threshold{sid}"] = threshold
+        severities = tuple(_SEV_ID)
+        lines = ["def add_frame(self, angles, validations, angle_ranges=None):"]
+        for aid, name, min_safe, max_safe in self._ranges_tuple:
+            namespace[f"lo{aid}"] = min_safe
+            namespace[f"hi{aid}"] = max_safe
+            lines += [f"    a{aid} = angles[{name!r}]", f"    v{aid} = validations[{name!r}]"]
+        columns = range(len(names))
+        lines.append(f"    idx = self.frame_count % {self._capacity}")
+        if names:
+            lines += [
+                f"    angle_buf[idx] = ({', '.join(f'round(a{aid} * {_ANGLE_SCALE})' for aid in columns)},)",
+                f"    valid_buf[idx] = ({', '.join(f'v{aid}' for aid in columns)},)",
+            ]
+        lines += [
+            "    ts_buf[idx] = perf_counter_ns()",
+            "    self.frame_count += 1",
+            f"    if {' and '.join(f'v{aid}' for aid in columns) or 'True'}:",
+            "        self.safe_frames += 1",
+            "        return",
+        ]
+
+        # Unrolled _check_safety_violations: one block per angle, one branch per severity
+        for aid, name, min_safe, max_safe in self._ranges_tuple:
+            lines += [
+                f"    if not v{aid}:",
+                f"        deviation = min(abs(a{aid} - lo{aid}), abs(a{aid} - hi{aid}))",
+            ]
+            for keyword, condition, severity in (
+                ("if", "deviation > 30", "high"),
+                ("elif", "deviation > 15", "medium"),
+                ("else", None, "low"),
+            ):
+                sid = _SEV_ID[severity]
+                lines += [
+                    f"        {keyword} {condition}:" if condition else "        else:",
+                    f"            vcount[{sid}, {aid}] += 1",
+                ]
+                if sid:
+                    lines.append(f"            vcount[:{sid}, {aid}] = 0")
+                lines += [
+                    f"            if vcount[{sid}, {aid}] >= threshold{sid}:",
+                    f"                self._escalate_violation({name!r}, a{aid}, lo{aid}, hi{aid}, {severities[sid]!r})",
+                ]
+
+        exec("\n".join(lines), namespace)
+        self.add_frame = namespace["add_frame"].__get__(self)
+
     def _check_safety_violations(self, angles, validations, angle_ranges):
         """
         Check for safety violations and escalate if needed.
@@ -99,13 +274,16 @@ class SessionScorer:
         :param validations: Dict of angle names to bool (safe or not)
         :param angle_ranges: Dict of angle names to (min, max) safe ranges
         """
-        for angle_name, is_safe in validations.items():
-            if angle_name not in angle_ranges:
-                continue
-                
-            if not is_safe:
+        # Common case: every angle is safe, nothing to track
+        if all(validations.values()):
+            return
+
+        if angle_ranges is not self._angle_ranges:
+            self.configure(angle_ranges)
+
+        for aid, angle_name, min_safe, max_safe in self._ranges_tuple:
+            if not validations.get(angle_name, True):
                 angle_value = angles.get(angle_name, 0)
-                min_safe, max_safe = angle_ranges[angle_name]
                 deviation = min(abs(angle_value - min_safe), abs(angle_value - max_safe))
                 
                 # Determine severity
@@ -116,19 +294,13 @@ class SessionScorer:
                 else:
                     severity = "low"
                 
-                # Track consecutive violations
-                if angle_name not in self.violation_tracking[severity]:
-                    self.violation_tracking[severity][angle_name] = 0
-                self.violation_tracking[severity][angle_name] += 1
-                
-                # Reset lower severity counters
-                for sev in ["medium", "low"]:
-                    if angle_name in self.violation_tracking[sev]:
-                        self.violation_tracking[sev][angle_name] = 0
+                # Track consecutive violations and reset lower severity counters
+                sid = _SEV_ID[severity]
+                self._vcount[sid, aid] += 1
+                self._vcount[:sid, aid] = 0
                 
                 # Check if we need to escalate
-                threshold = self.escalation_thresholds.get(severity, 5)
-                if self.violation_tracking[severity][angle_name] >= threshold:
+                if self._vcount[sid, aid] >= self._thresholds[sid]:
                     self._escalate_violation(angle_name, angle_value, min_safe, max_safe, severity)
     
     def _escalate_violation(self, angle_name, angle_value, min_safe, max_safe, severity):
@@ -141,21 +313,14 @@ class SessionScorer:
         :param max_safe: Maximum safe angle
         :param severity: Severity level
         """
-        violation = SafetyViolation(angle_name, angle_value, min_safe, max_safe, severity, self.frame_count)
+        violation = SafetyViolation(
+            angle_name, angle_value, min_safe, max_safe, severity, self.frame_count, self._clock_anchor
+        )
         
         # Escalate based on severity
-        if severity == "critical":
-            self.current_warning_level = 4
-            violation.escalation_level = 4
-        elif severity == "high":
-            violation.escalation_level = max(violation.escalation_level, 3)
-            self.current_warning_level = max(self.current_warning_level, 3)
-        elif severity == "medium":
-            violation.escalation_level = max(violation.escalation_level, 2)
-            self.current_warning_level = max(self.current_warning_level, 2)
-        elif severity == "low":
-            violation.escalation_level = max(violation.escalation_level, 1)
-            self.current_warning_level = max(self.current_warning_level, 1)
+        level = _SEV_LEVEL[severity]
+        violation.escalation_level = level
+        self.current_warning_level = max(self.current_warning_level, level)
         
         violation.escalated = True
         self.safety_violations.append(violation)
@@ -187,16 +352,8 @@ class SessionScorer:
     def _get_warning_text(self):
         """Get warning text based on current warning level."""
         level = self.current_warning_level
-        if level == 0:
-            return "SAFE"
-        elif level == 1:
-            return "CAUTION: Minor deviation detected"
-        elif level == 2:
-            return "WARNING: Moderate deviation - adjust position"
-        elif level == 3:
-            return "HIGH WARNING: Significant deviation - slow down"
-        elif level == 4:
-            return "CRITICAL: Stop exercise immediately"
+        if 0 <= level < len(_WARNING_TEXTS):
+            return _WARNING_TEXTS[level]
         return "UNKNOWN"
     
     def get_violation_summary(self):
@@ -229,11 +386,11 @@ class SessionScorer:
 
         :return: Score from 0-100
         """
-        if not self.frames:
+        if not self.frame_count:
             return 0
 
-        total_frames = len(self.frames)
-        safe_frames = sum(1 for frame in self.frames if all(frame["validations"].values()))
+        total_frames = self.frame_count
+        safe_frames = self.safe_frames
 
         # Completion quality: percentage of frames with all angles safe
         completion_quality = (safe_frames / total_frames) * 100
@@ -241,20 +398,18 @@ class SessionScorer:
         # Safety penalty: reduce score based on violations
         violation_penalty = min(30, len(self.safety_violations) * 2)
 
-        # Consistency: average deviation from safe ranges
-        angle_names = list(self.frames[0]["angles"].keys())
-        consistencies = {}
-        for angle_name in angle_names:
-            values = [frame["angles"][angle_name] for frame in self.frames]
-            if len(values) > 1:
-                variance = statistics.variance(values)
-                # Lower variance = higher consistency
-                consistency = max(0, 100 - variance)  # Arbitrary scaling
-            else:
-                consistency = 100
-            consistencies[angle_name] = consistency
-
-        average_consistency = statistics.mean(consistencies.values()) if consistencies else 100
+        # Consistency: average deviation from safe ranges (over retained frames;
+        # row order doesn't matter for variance)
+        angles = self._angles[:min(total_frames, self._capacity)]
+        if not angles.shape[1]:
+            average_consistency = 100
+        elif len(angles) > 1:
+            # Variance of the scaled integers, converted back to degrees squared
+            variances = np.var(angles, axis=0, ddof=1, dtype=np.float64) / _ANGLE_SCALE ** 2
+            # Lower variance = higher consistency
+            average_consistency = float(np.clip(100 - variances, 0, 100).mean())  # Arbitrary scaling
+        else:
+            average_consistency = 100
 
         # Overall score: weighted average with safety penalty
         score = (completion_quality * 0.5) + (average_consistency * 0.3) + (100 - violation_penalty) * 0.2
@@ -268,13 +423,10 @@ class SessionScorer:
         :return: Dict with score and stats
         """
         score = self.calculate_score()
-        total_frames = len(self.frames)
-        safe_frames = sum(1 for frame in self.frames if all(frame["validations"].values()))
-
         return {
             "exercise": self.exercise_name,
-            "total_frames": total_frames,
-            "safe_frames": safe_frames,
+            "total_frames": self.frame_count,
+            "safe_frames": self.safe_frames,
             "score": score,
             "safety": self.get_violation_summary()
         }
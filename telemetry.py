@@ -0,0 +1,59 @@
+# telemetry.py
+# Shared logging helpers for the demos: queue-backed console logging, frame sampling
+# and lazy angle formatting, so log I/O stays off the per-frame path
+
+import logging
+import logging.handlers
+import queue
+import sys
+
+
+class FrameSampleFilter(logging.Filter):
+    """
+    Pass one frame log record in every `every`. Frame records carry their frame
+    number as `extra={"frame": n}`; any other record always passes.
+    """
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+
+    def filter(self, record):
+        frame = getattr(record, "frame", None)
+        return not isinstance(frame, int) or frame % self.every == 0
+
+
+class Angles:
+    """Formats an angles dict with fixed-width, one-decimal values, only when the log line is emitted."""
+
+    __slots__ = ("angles",)
+
+    def __init__(self, angles):
+        self.angles = angles
+
+    def __str__(self):
+        return "{" + ", ".join(f"{name}: {value:5.1f}" for name, value in self.angles.items()) + "}"
+
+
+def start_queue_logging(logger, sample_every=None):
+    """
+    Route a logger's records through a queue to a background thread writing to stdout.
+
+    :param logger: Logger to configure (its handlers are replaced)
+    :param sample_every: Optional N to keep one frame record in every N (see FrameSampleFilter)
+    :return: Tuple of (started QueueListener, log record queue); stop the listener to flush
+    """
+    log_q = queue.Queue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_q, handler)
+
+    # Sampling happens on the queue handler, so dropped lines are never formatted
+    queue_handler = logging.handlers.QueueHandler(log_q)
+    if sample_every is not None:
+        queue_handler.addFilter(FrameSampleFilter(sample_every))
+    logger.handlers[:] = [queue_handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    return listener, log_q
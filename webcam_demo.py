@@ -2,21 +2,47 @@
 # Real-time webcam demo for physiotherapy exercise validation
 # Includes: live MediaPipe integration, phase-aware feedback, safety escalation, live observability
 
+import argparse
 import cv2
+import functools
+import logging
 import mediapipe as mp
+import queue
+import threading
 import time
 import numpy as np
+from collections import OrderedDict, namedtuple
 from datetime import datetime
 
-from physio_exercises import EXERCISES, get_shoulder_abduction_angle, get_elbow_flexion_angle, get_shoulder_rotation_angle
+from physio_exercises import EXERCISES, JOINT_ANGLE_NAMES, get_joint_angles
 from realtime_feedback import generate_feedback, PhaseDetector
 from session_scoring import SessionScorer
+from telemetry import Angles, start_queue_logging
 
 # MediaPipe setup
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
+# Telemetry log lines; written to stdout by a background listener thread
+logger = logging.getLogger("physio.webcam")
+
+# Emit one telemetry line in every LOG_EVERY displayed frames
+LOG_EVERY = 30
+
+# HUD layout
+WARNING_BAR_HEIGHT = 40
+HUD_CACHE_SIZE = 64
+
+# Pose model defaults (overridable with --model-complexity / --inference-size)
+# INFERENCE_SIZE is the longest side, in pixels, of the frame given to MediaPipe;
+# 0 runs inference at full camera resolution
+MODEL_COMPLEXITY = 1
+INFERENCE_SIZE = 368
+
+# Run flip / resize / colour conversion through OpenCV's T-API (OpenCL) when available
+USE_OPENCL = cv2.ocl.haveOpenCL()
+
 
 def draw_angle_on_frame(frame, angle_name, angle_value, position, is_safe, color=(0, 255, 0)):
     """
@@ -49,12 +75,11 @@ def draw_angle_on_frame(frame, angle_name, angle_value, position, is_safe, color
     )
 
 
-def draw_safety_warning(frame, warning_text, warning_level):
+def draw_warning_bar(frame, warning_level):
     """
-    Draw safety warning on frame with appropriate styling.
+    Draw the translucent warning bar background at the top of the frame.
     
     :param frame: Video frame
-    :param warning_text: Warning message
     :param warning_level: 0-4 (none to critical)
     """
     # Background color based on warning level
@@ -69,29 +94,62 @@ def draw_safety_warning(frame, warning_text, warning_level):
     else:
         bg_color = (0, 0, 0)  # Black for critical
     
-    # Draw warning bar at top
-    bar_height = 40
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (0, 0), (frame.shape[1], bar_height), bg_color, -1)
-    cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
+    # Blend the bar colour into the top rows only (the filled rectangle this
+    # replaces covered rows 0..WARNING_BAR_HEIGHT inclusive)
+    roi = frame[:WARNING_BAR_HEIGHT + 1]
+    cv2.addWeighted(np.full_like(roi, bg_color), 0.7, roi, 0.3, 0, dst=roi)
+
+
+@functools.lru_cache(maxsize=16)
+def _text_size(text, font_scale=0.8, thickness=2):
+    """
+    Cached cv2.getTextSize for FONT_HERSHEY_SIMPLEX (warning texts are a small fixed set).
+    
+    :return: (width, height) in pixels
+    """
+    return cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)[0]
+
+
+def draw_warning_text(frame, warning_text, hud_cache=None):
+    """
+    Draw the warning message centred in the warning bar.
     
-    # Draw warning text
-    text_size = cv2.getTextSize(warning_text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
+    :param frame: Video frame
+    :param warning_text: Warning message
+    :param hud_cache: Optional HudCache to draw the text from
+    """
+    put_text = hud_cache.put_text if hud_cache is not None else cv2.putText
+    text_size = _text_size(warning_text)
     text_x = (frame.shape[1] - text_size[0]) // 2
-    text_y = (bar_height + text_size[1]) // 2
+    text_y = (WARNING_BAR_HEIGHT + text_size[1]) // 2
     
     # White text
-    cv2.putText(frame, warning_text, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    put_text(frame, warning_text, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
 
 
-def draw_phase_indicator(frame, phase, hold_frames):
+def draw_safety_warning(frame, warning_text, warning_level, hud_cache=None):
+    """
+    Draw safety warning on frame with appropriate styling.
+    
+    :param frame: Video frame
+    :param warning_text: Warning message
+    :param warning_level: 0-4 (none to critical)
+    :param hud_cache: Optional HudCache to draw the text from
+    """
+    draw_warning_bar(frame, warning_level)
+    draw_warning_text(frame, warning_text, hud_cache)
+
+
+def draw_phase_indicator(frame, phase, hold_frames, hud_cache=None):
     """
     Draw current phase indicator on frame.
     
     :param frame: Video frame
     :param phase: Current phase (RAISE, HOLD, LOWER, NEUTRAL)
     :param hold_frames: Frames in hold phase
+    :param hud_cache: Optional HudCache for the phase label (the changing hold counter is always drawn live)
     """
+    put_text = hud_cache.put_text if hud_cache is not None else cv2.putText
     # Phase colors
     phase_colors = {
         "RAISE": (255, 165, 0),    # Orange
@@ -103,7 +161,7 @@ def draw_phase_indicator(frame, phase, hold_frames):
     color = phase_colors.get(phase, (128, 128, 128))
     
     # Draw phase indicator in corner
-    cv2.putText(frame, f"Phase: {phase}", (10, frame.shape[0] - 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    put_text(frame, f"Phase: {phase}", (10, frame.shape[0] - 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
     if phase == "HOLD":
         cv2.putText(frame, f"Hold: {hold_frames} frames", (10, frame.shape[0] - 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
 
@@ -126,23 +184,158 @@ def draw_live_observability(frame, angles, fps, frame_count):
     cv2.putText(frame, timestamp, (frame.shape[1] - 120, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
 
-def process_frame(frame, pose, exercise, scorer, phase_detector):
+class HudCache:
+    """
+    LRU cache of pre-rendered HUD text patches.
+    
+    Warning and phase texts come from small fixed sets, so each is rasterized
+    once into a patch covering just its bounding box and then copied (through
+    its mask) into that small region of later frames. Drop-in for cv2.putText.
     """
-    Process a single frame and return annotated frame with feedback.
+    
+    def __init__(self, capacity=HUD_CACHE_SIZE):
+        """
+        :param capacity: Maximum number of cached text patches
+        """
+        self.capacity = capacity
+        self._patches = OrderedDict()
+    
+    def get_patch(self, text, font_face, font_scale, color, thickness):
+        """
+        Get the rendered patch for a text, rendering it on a miss.
+        
+        :return: Tuple of (BGR patch, uint8 mask of drawn pixels, (x, y) of the text origin in the patch)
+        """
+        key = (text, font_face, font_scale, color, thickness)
+        entry = self._patches.get(key)
+        if entry is not None:
+            self._patches.move_to_end(key)
+            return entry
+        
+        (width, height), baseline = cv2.getTextSize(text, font_face, font_scale, thickness)
+        # Strokes reach up to about half the thickness outside the reported box
+        pad = thickness + 2
+        origin = (pad, pad + height)
+        patch = np.zeros((height + baseline + 2 * pad, width + 2 * pad, 3), dtype=np.uint8)
+        cv2.putText(patch, text, origin, font_face, font_scale, color, thickness)
+        entry = (patch, patch.any(axis=2).astype(np.uint8), origin)
+        self._patches[key] = entry
+        if len(self._patches) > self.capacity:
+            self._patches.popitem(last=False)
+        return entry
+    
+    def put_text(self, frame, text, org, font_face, font_scale, color, thickness):
+        """
+        Draw text like cv2.putText, copying a cached patch into the text's region.
+        
+        :param frame: Video frame
+        :param text: Text to draw
+        :param org: Bottom-left corner of the text, as for cv2.putText
+        """
+        patch, mask, (origin_x, origin_y) = self.get_patch(text, font_face, font_scale, color, thickness)
+        x0 = org[0] - origin_x
+        y0 = org[1] - origin_y
+        
+        # Clip the patch to the frame
+        top, left = max(0, -y0), max(0, -x0)
+        bottom = min(patch.shape[0], frame.shape[0] - y0)
+        right = min(patch.shape[1], frame.shape[1] - x0)
+        if top >= bottom or left >= right:
+            return
+        roi = frame[y0 + top:y0 + bottom, x0 + left:x0 + right]
+        cv2.copyTo(patch[top:bottom, left:right], mask[top:bottom, left:right], roi)
+
+
+# Result of analysing one frame (handed from the inference thread to the display loop)
+FrameAnalysis = namedtuple(
+    "FrameAnalysis",
+    "frame results feedbacks angles validations safety_status phase hold_frames"
+)
+
+
+def inference_shape(frame_shape, inference_size):
+    """
+    Shape of the frame given to pose inference (aspect ratio preserved).
+    
+    :param frame_shape: Camera frame shape (height, width, channels)
+    :param inference_size: Longest side in pixels; 0/None keeps full resolution
+    :return: (height, width, channels)
+    """
+    height, width, channels = frame_shape
+    longest = max(height, width)
+    if not inference_size or longest <= inference_size:
+        return frame_shape
+    scale = inference_size / longest
+    return (max(1, round(height * scale)), max(1, round(width * scale)), channels)
+
+
+def tracked_angle_ranges(exercise):
+    """
+    Precompute which joint angles an exercise checks, with their safe ranges.
+    
+    :param exercise: PhysioExercise object
+    :return: Tuple of (angle_name, min_safe, max_safe), in get_joint_angles order
+    """
+    return tuple(
+        (name, *exercise.angle_ranges[name])
+        for name in JOINT_ANGLE_NAMES if name in exercise.angle_ranges
+    )
+
+
+def _prepare_frame_opencl(frame, inference_size):
+    """
+    Flip, downscale and convert a frame on the OpenCL device via cv2.UMat.
+    Only the flipped frame (for drawing) and the RGB inference input come back to host memory.
+    
+    :param frame: Input video frame
+    :param inference_size: Longest side of the inference input; None/0 for full resolution
+    :return: Flipped BGR frame, RGB inference frame (both ndarrays)
+    """
+    uframe = cv2.flip(cv2.UMat(frame), 1)
+    small_shape = inference_shape(frame.shape, inference_size)
+    if small_shape != frame.shape:
+        usmall = cv2.resize(uframe, (small_shape[1], small_shape[0]), interpolation=cv2.INTER_AREA)
+    else:
+        usmall = uframe
+    rgb_frame = cv2.cvtColor(usmall, cv2.COLOR_BGR2RGB).get()
+    return uframe.get(), rgb_frame
+
+
+def analyze_frame(frame, pose, exercise, scorer, phase_detector, flip_buf=None, rgb_buf=None, inference_size=None,
+                  use_opencl=False, tracked_ranges=None):
+    """
+    Run pose inference, angle validation, feedback and scoring for one frame.
+    Inference may run on a downscaled copy; landmarks are normalized, so they
+    still map onto the full-resolution frame used for drawing.
     
     :param frame: Input video frame
     :param pose: MediaPipe pose solution
     :param exercise: PhysioExercise object
     :param scorer: SessionScorer object
     :param phase_detector: PhaseDetector object
-    :return: Annotated frame, list of feedbacks, safety status
+    :param flip_buf: Optional preallocated buffer (same shape as frame) for the flipped frame
+    :param rgb_buf: Optional preallocated buffer (inference_shape of frame) for the RGB frame
+    :param inference_size: Longest side of the inference input; None/0 for full resolution
+    :param use_opencl: Do the pixel work through cv2.UMat (buffers are then unused)
+    :param tracked_ranges: Precomputed tracked_angle_ranges(exercise); computed when omitted
+    :return: FrameAnalysis (frame is the flipped BGR frame to draw on)
     """
-    # Flip and convert
-    frame = cv2.flip(frame, 1)
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if use_opencl:
+        frame, rgb_frame = _prepare_frame_opencl(frame, inference_size)
+    else:
+        # Flip, downscale and convert (into the reusable buffers when given)
+        frame = cv2.flip(frame, 1, dst=flip_buf)
+        small_shape = inference_shape(frame.shape, inference_size)
+        if small_shape != frame.shape:
+            small = cv2.resize(frame, (small_shape[1], small_shape[0]), interpolation=cv2.INTER_AREA)
+        else:
+            small = frame
+        rgb_frame = cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb_buf)
     
-    # Process pose
+    # Process pose (read-only input lets MediaPipe skip its own copy)
+    rgb_frame.flags.writeable = False
     results = pose.process(rgb_frame)
+    rgb_frame.flags.writeable = True
     
     # Initialize feedback variables
     feedbacks = []
@@ -153,30 +346,24 @@ def process_frame(frame, pose, exercise, scorer, phase_detector):
     if results.pose_landmarks:
         landmarks = results.pose_landmarks.landmark
         
-        # Calculate angles
-        if "shoulder_abduction" in exercise.angle_ranges:
-            angle = get_shoulder_abduction_angle(landmarks)
-            angles["shoulder_abduction"] = angle
-            validations["shoulder_abduction"] = exercise.is_angle_safe("shoulder_abduction", angle)
-
-        if "elbow_flexion" in exercise.angle_ranges:
-            angle = get_elbow_flexion_angle(landmarks)
-            angles["elbow_flexion"] = angle
-            validations["elbow_flexion"] = exercise.is_angle_safe("elbow_flexion", angle)
-
-        if "shoulder_internal_rotation" in exercise.angle_ranges or "shoulder_external_rotation" in exercise.angle_ranges:
-            rot_angles = get_shoulder_rotation_angle(landmarks)
-            angles.update(rot_angles)
-            validations["shoulder_internal_rotation"] = exercise.is_angle_safe("shoulder_internal_rotation", rot_angles.get("internal", 0))
-            validations["shoulder_external_rotation"] = exercise.is_angle_safe("shoulder_external_rotation", rot_angles.get("external", 0))
+        # Calculate all angles from one read of the landmarks, keep the ones this exercise tracks
+        if tracked_ranges is None:
+            tracked_ranges = tracked_angle_ranges(exercise)
+        joint_angles = get_joint_angles(landmarks)
+        for angle_name, min_safe, max_safe in tracked_ranges:
+            angle = joint_angles[angle_name]
+            angles[angle_name] = angle
+            validations[angle_name] = min_safe <= angle <= max_safe
         
         # Get phase info
         primary_angle = angles.get("shoulder_abduction") or angles.get("elbow_flexion") or 0
-        frame_count = len(scorer.frames) + 1
-        phase_info = phase_detector.detect_phase(primary_angle, frame_count)
+        frame_count = scorer.frame_count + 1
+        phase_detector.detect_phase(primary_angle, frame_count)
         
         # Generate feedback (now phase-aware)
-        feedbacks = generate_feedback(exercise.name.lower(), landmarks, phase_info)
+        feedbacks = generate_feedback(
+            phase_detector.exercise_name, landmarks, phase_detector, exercise=exercise, angles=joint_angles
+        )
         
         # Add frame to scorer (now with angle ranges for safety tracking)
         scorer.add_frame(angles, validations, exercise.angle_ranges)
@@ -184,34 +371,154 @@ def process_frame(frame, pose, exercise, scorer, phase_detector):
         # Get safety status for runtime display
         safety_status = scorer.get_safety_status()
     
+    return FrameAnalysis(
+        frame, results, feedbacks, angles, validations, safety_status,
+        phase_detector.phase, phase_detector.hold_frames
+    )
+
+
+def annotate_frame(analysis, hud_cache=None):
+    """
+    Draw pose, angles, safety warning and phase indicator onto the analysed frame.
+    
+    :param analysis: FrameAnalysis from analyze_frame
+    :param hud_cache: Optional HudCache for the warning and phase text
+    :return: Annotated frame
+    """
+    frame = analysis.frame
+    
     # Draw pose landmarks
-    if results.pose_landmarks:
+    if analysis.results.pose_landmarks:
         mp_drawing.draw_landmarks(
             frame, 
-            results.pose_landmarks, 
+            analysis.results.pose_landmarks, 
             mp_pose.POSE_CONNECTIONS,
             landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style()
         )
         
         # Draw angles on frame
         y_offset = 30
-        for angle_name, angle_value in angles.items():
-            is_safe = validations.get(angle_name, True)
+        for angle_name, angle_value in analysis.angles.items():
+            is_safe = analysis.validations.get(angle_name, True)
             draw_angle_on_frame(frame, angle_name, angle_value, (10, y_offset), is_safe)
             y_offset += 25
         
         # Draw safety warning
-        draw_safety_warning(frame, safety_status["warning_text"], safety_status["warning_level"])
+        draw_safety_warning(
+            frame, analysis.safety_status["warning_text"], analysis.safety_status["warning_level"], hud_cache
+        )
         
         # Draw phase indicator
-        phase_info = phase_detector.get_phase_info()
-        draw_phase_indicator(frame, phase_info["phase"], phase_info["hold_frames"])
+        draw_phase_indicator(frame, analysis.phase, analysis.hold_frames, hud_cache)
+    
+    return frame
+
+
+def process_frame(frame, pose, exercise, scorer, phase_detector, flip_buf=None, rgb_buf=None):
+    """
+    Process a single frame and return annotated frame with feedback.
+    
+    :param frame: Input video frame
+    :param pose: MediaPipe pose solution
+    :param exercise: PhysioExercise object
+    :param scorer: SessionScorer object
+    :param phase_detector: PhaseDetector object
+    :param flip_buf: Optional preallocated buffer (same shape as frame) for the flipped frame
+    :param rgb_buf: Optional preallocated buffer (same shape as frame) for the RGB frame
+    :return: Annotated frame, list of feedbacks, safety status
+    """
+    analysis = analyze_frame(frame, pose, exercise, scorer, phase_detector, flip_buf, rgb_buf)
+    return annotate_frame(analysis), analysis.feedbacks, analysis.angles, analysis.safety_status
+
+
+def _put_latest(q, item):
+    """
+    Put item into a single-slot queue, replacing any item not yet taken.
     
-    return frame, feedbacks, angles, safety_status
+    :return: The replaced item, or None
+    """
+    try:
+        stale = q.get_nowait()
+    except queue.Empty:
+        stale = None
+    q.put_nowait(item)
+    return stale
+
+
+def capture_loop(cap, frame_q, stop_event):
+    """
+    Read webcam frames into a single-slot queue, dropping stale ones.
+    Puts None when capture fails or raises.
+    """
+    try:
+        while not stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                return
+            _put_latest(frame_q, frame)
+    finally:
+        _put_latest(frame_q, None)
 
 
-def main():
-    """Main function to run the live physio demo."""
+def inference_loop(frame_q, result_q, free_q, stop_event, pose, exercise, scorer, phase_detector,
+                   inference_size=None, use_opencl=False):
+    """
+    Analyse the latest captured frame and publish the newest FrameAnalysis.
+    Owns the MediaPipe pose instance; puts None when capture has ended or
+    analysis raises, so the display loop never waits on a dead thread.
+    
+    Flipped frames are written into buffers taken from free_q. A buffer goes
+    back on free_q when the display loop is done with it, or here when its
+    unread result is replaced, so a frame is never overwritten while drawn.
+    """
+    try:
+        rgb_buf = None
+        tracked_ranges = tracked_angle_ranges(exercise)
+        # Every frame carries exactly the exercise's angles, so the scorer can be specialized
+        if len(tracked_ranges) == len(exercise.angle_ranges):
+            scorer.specialize(exercise.angle_ranges)
+        while not stop_event.is_set():
+            try:
+                frame = frame_q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if frame is None:
+                return
+            
+            # Wait for a buffer the display loop has released
+            flip_buf = None
+            while flip_buf is None and not stop_event.is_set():
+                try:
+                    flip_buf = free_q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            if flip_buf is None:
+                return
+            if flip_buf.shape != frame.shape:
+                flip_buf = np.empty_like(frame)
+            small_shape = inference_shape(frame.shape, inference_size)
+            if rgb_buf is None or rgb_buf.shape != small_shape:
+                rgb_buf = np.empty(small_shape, dtype=frame.dtype)
+            
+            analysis = analyze_frame(
+                frame, pose, exercise, scorer, phase_detector, flip_buf, rgb_buf, inference_size, use_opencl,
+                tracked_ranges
+            )
+            stale = _put_latest(result_q, analysis)
+            if stale is not None:
+                free_q.put_nowait(stale.frame)
+    finally:
+        _put_latest(result_q, None)
+
+
+def main(model_complexity=MODEL_COMPLEXITY, inference_size=INFERENCE_SIZE, use_opencl=USE_OPENCL):
+    """
+    Main function to run the live physio demo.
+    
+    :param model_complexity: MediaPipe Pose model complexity (0, 1 or 2)
+    :param inference_size: Longest side of the frame given to pose inference (0 = full resolution)
+    :param use_opencl: Run per-frame pixel work through OpenCL (ignored if OpenCL is unavailable)
+    """
     print("=" * 60)
     print("LIVE PHYSIO INTELLIGENCE DEMO")
     print("Features: Real-time pose detection, phase-aware feedback, safety escalation")
@@ -231,6 +538,9 @@ def main():
     print(f"\nSelected: {exercise.name}")
     print(f"Description: {exercise.description}")
     print("\nStarting webcam...")
+    use_opencl = use_opencl and USE_OPENCL
+    if use_opencl:
+        print("OpenCL available: frame preprocessing runs on the GPU")
     
     # Initialize scorer with safety escalation
     scorer = SessionScorer(exercise_name)
@@ -253,7 +563,7 @@ def main():
     with mp_pose.Pose(
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5,
-        model_complexity=1
+        model_complexity=model_complexity
     ) as pose:
         
         print("\n" + "=" * 60)
@@ -262,24 +572,55 @@ def main():
         print("=" * 60)
         
         frame_count = 0
-        prev_time = time.time()
+        prev_time = time.monotonic()
         running = True
         
+        # Capture and inference run on their own threads; this loop only draws
+        # and displays. Single-slot queues always hold the latest item.
+        frame_q = queue.Queue(maxsize=1)
+        result_q = queue.Queue(maxsize=1)
+        # Flip buffer pool: one frame being drawn, one queued, one being written.
+        # Empty placeholders are replaced with frame-sized buffers on first use.
+        free_q = queue.Queue()
+        for _ in range(3):
+            free_q.put_nowait(np.empty((0, 0, 3), dtype=np.uint8))
+        stop_event = threading.Event()
+        hud_cache = HudCache()
+        log_listener, _ = start_queue_logging(logger)
+        threads = [
+            threading.Thread(target=capture_loop, args=(cap, frame_q, stop_event), daemon=True),
+            threading.Thread(
+                target=inference_loop,
+                args=(
+                    frame_q, result_q, free_q, stop_event, pose, exercise, scorer, phase_detector,
+                    inference_size, use_opencl
+                ),
+                daemon=True
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+        
         while running:
-            ret, frame = cap.read()
-            if not ret:
-                print("Failed to capture frame")
+            try:
+                analysis = result_q.get(timeout=0.1)
+            except queue.Empty:
+                # Keep the window responsive while waiting for inference
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    running = False
+                continue
+            if analysis is None:
+                print("Frame pipeline stopped: capture ended or analysis failed")
                 break
             
             frame_count += 1
             
-            # Process frame
-            annotated_frame, feedbacks, angles, safety_status = process_frame(
-                frame, pose, exercise, scorer, phase_detector
-            )
+            annotated_frame = annotate_frame(analysis, hud_cache)
+            angles = analysis.angles
+            safety_status = analysis.safety_status
             
             # Calculate FPS
-            current_time = time.time()
+            current_time = time.monotonic()
             frame_fps = 1.0 / (current_time - prev_time)
             prev_time = current_time
             
@@ -289,10 +630,15 @@ def main():
             # Display frame
             cv2.imshow('Physio Intelligence - Live Demo', annotated_frame)
             
-            # Console logging (optional - can be disabled for cleaner output)
-            if frame_count % 30 == 0:  # Log every 30 frames
-                safety = "SAFE" if safety_status["is_safe"] else "WARNING"
-                print(f"[Frame {frame_count}] FPS: {frame_fps:.1f} | {safety} | Angles: {angles}")
+            # imshow has copied the pixels; the buffer can be reused for inference
+            free_q.put_nowait(annotated_frame)
+            
+            # Console logging (set the "physio.webcam" logger above INFO to disable)
+            if frame_count % LOG_EVERY == 0:
+                logger.info(
+                    "frame=%d fps=%5.1f safe=%s %s",
+                    frame_count, frame_fps, safety_status["is_safe"], Angles(angles)
+                )
             
             # Handle key presses
             key = cv2.waitKey(1) & 0xFF
@@ -312,7 +658,13 @@ def main():
                 print(f"Highest Warning: Level {summary['safety']['highest_warning_level']}")
                 print("=" * 60)
         
+        # Stop workers before releasing the camera and pose model
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        
         # Cleanup
+        log_listener.stop()
         cap.release()
         cv2.destroyAllWindows()
         
@@ -339,4 +691,22 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Live physio intelligence webcam demo")
+    parser.add_argument(
+        "--model-complexity", type=int, choices=(0, 1, 2), default=MODEL_COMPLEXITY,
+        help="MediaPipe Pose model complexity (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--inference-size", type=int, default=INFERENCE_SIZE,
+        help="Longest side in pixels of the frame used for pose inference, 0 for full resolution (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--no-opencl", action="store_true",
+        help="Keep frame preprocessing on the CPU even if OpenCL is available"
+    )
+    args = parser.parse_args()
+    main(
+        model_complexity=args.model_complexity,
+        inference_size=args.inference_size,
+        use_opencl=USE_OPENCL and not args.no_opencl
+    )